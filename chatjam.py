@@ -10,19 +10,29 @@ Note: Calling OpenAI from within this environment may not be possible; this scri
 import os
 import pygame
 import threading
+import asyncio
+import concurrent.futures
 import time
 import queue
 import webbrowser
 import urllib.request
 import io
+import itertools
 import json
 import re
+import string
+from collections import OrderedDict
 
 try:
     import openai
 except Exception:
     openai = None
 
+try:
+    import urllib3
+except Exception:
+    urllib3 = None
+
 # tts
 try:
     import pyttsx3
@@ -35,22 +45,109 @@ ASSET_DIR = Path(r"C:\Users\slane\Downloads")
 WIDTH, HEIGHT = 800, 600
 FPS = 60
 
-# Colors
+# Colors (shared tuples so surface-cache keys always compare equal)
 BG = (30, 30, 30)
 PANEL = (40, 40, 40)
 TEXT = (230, 230, 230)
 INPUT_BG = (25, 25, 25)
+LABEL_TEXT = (200, 200, 200)
+CODE_TEXT = (200, 220, 200)
+LINK_TEXT = (100, 180, 240)
+HINT_TEXT = (180, 180, 180)
+BADGE_TEXT = (255, 255, 255)
+
+# shared pooled HTTPS client: keep-alive and TLS session reuse make repeat
+# downloads much cheaper than a fresh urlopen per request
+if urllib3 is not None:
+    _HTTP = urllib3.PoolManager(maxsize=4, retries=urllib3.Retry(2),
+                                timeout=urllib3.Timeout(connect=3, read=10))
+else:
+    _HTTP = None
+
+_DOWNLOAD_CHUNK = 65536
+_MAX_DOWNLOAD_BYTES = 8 * 1024 * 1024
+
+def _http_get(url, timeout=10, max_bytes=_MAX_DOWNLOAD_BYTES):
+    # fetch url bytes in bounded chunks with a read timeout so a hung or
+    # oversized response cannot stall a worker or exhaust memory
+    buf = io.BytesIO()
+    if _HTTP is not None:
+        resp = _HTTP.request('GET', url, preload_content=False,
+                             timeout=urllib3.Timeout(connect=3, read=8))
+        try:
+            for chunk in resp.stream(_DOWNLOAD_CHUNK):
+                buf.write(chunk)
+                if buf.tell() > max_bytes:
+                    raise IOError(f'download larger than {max_bytes} bytes: {url}')
+        finally:
+            resp.release_conn()
+    else:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            while True:
+                chunk = resp.read(_DOWNLOAD_CHUNK)
+                if not chunk:
+                    break
+                buf.write(chunk)
+                if buf.tell() > max_bytes:
+                    raise IOError(f'download larger than {max_bytes} bytes: {url}')
+    return buf.getvalue()
 
 # Thread-safe queue for chat results
 result_q = queue.Queue()
 
+# bounded worker pool: chat queries share a small pool instead of spawning a
+# thread per Enter press
+_CHAT_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='chat')
+
+# TTS queue consumed by one long-lived worker; pyttsx3's runAndWait is a
+# nested event loop and the engine is not re-entrant, so all speech goes
+# through here. A None sentinel stops the worker at shutdown.
+_tts_q = queue.Queue()
+
+# custom event posted by workers so the GUI wakes as soon as a result lands
+RESULT_EVENT = pygame.event.custom_type()
+
+def post_result(res):
+    # queue a worker result and wake the event loop
+    result_q.put(res)
+    try:
+        pygame.event.post(pygame.event.Event(RESULT_EVENT))
+    except pygame.error:
+        pass
+
+# precompiled patterns used by the chat renderer
+_CODE_FENCE_RE = re.compile(r'(```[\s\S]*?```)')
+_URL_RE = re.compile(r'(https?://[^\s]+)')
+
+# Cache of rendered text surfaces keyed on (font id, text, color).
+# Fonts are created once in main(), so id(font) is a stable key.
+_surf_cache = OrderedDict()
+_SURF_CACHE_MAX = 512
+
+def render_cached(font, text, color):
+    key = (id(font), text, color)
+    surf = _surf_cache.get(key)
+    if surf is not None:
+        _surf_cache.move_to_end(key)
+        return surf
+    surf = font.render(text, True, color)
+    _surf_cache[key] = surf
+    if len(_surf_cache) > _SURF_CACHE_MAX:
+        _surf_cache.popitem(last=False)
+    return surf
+
+def parse_command(prompt):
+    # classify a prompt once at submit time
+    # image query prefix: "image: cats" or "/img cats"
+    p = prompt.lower().strip()
+    if p.startswith('image:') or p.startswith('/img'):
+        q = prompt.split(':',1)[1].strip() if ':' in prompt else prompt.split(' ',1)[1] if ' ' in prompt else ''
+        return ('image', q)
+    return ('text', prompt)
+
 # Simple fallback responder
 def local_responder(prompt):
     p = prompt.lower().strip()
-    # image query prefix: "image: cats" or "/img cats"
-    if p.startswith('image:') or p.startswith('/img'):
-        # return a special directive for the worker to handle
-        return {'_image_query': prompt.split(':',1)[1].strip() if ':' in prompt else prompt.split(' ',1)[1] if ' ' in prompt else ''}
     if 'weather' in p:
         return "I don't have live weather here, but remember to bring a jacket if it's cold!"
     if 'time' in p:
@@ -61,23 +158,105 @@ def local_responder(prompt):
         return "This is a demo chatbot. You can ask simple questions or set OPENAI_API_KEY to use OpenAI." 
     return "Sorry, I can't answer that locally. Try setting an OpenAI API key in your environment to get full answers."
 
+OPENAI_MODEL = "gpt-4o-mini"
+
+# ids for in-flight streamed responses
+_stream_ids = itertools.count(1)
+
+# with a new-style SDK, all OpenAI traffic runs on one asyncio loop in a
+# daemon thread: concurrent requests share an IO thread and connection
+# instead of each tying up a pool worker for the whole call
+if openai is not None and hasattr(openai, 'AsyncOpenAI'):
+    _AI_LOOP = asyncio.new_event_loop()
+    threading.Thread(target=_AI_LOOP.run_forever, daemon=True).start()
+else:
+    _AI_LOOP = None
+
+# one shared async client so every request reuses the same connection pool;
+# created lazily on the loop thread by the first call
+_ai_client = None
+
+async def _async_chat(prompt, api_key):
+    global _ai_client
+    if _ai_client is None:
+        _ai_client = openai.AsyncOpenAI(api_key=api_key)
+    resp = await _ai_client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.6,
+        max_tokens=400,
+        stream=True,
+    )
+    rid = next(_stream_ids)
+    post_result({'_stream_start': rid})
+    pieces = []
+    async for chunk in resp:
+        delta = chunk.choices[0].delta.content or ''
+        if delta:
+            pieces.append(delta)
+            post_result({'_stream': delta, 'id': rid})
+    res = ''.join(pieces).strip()
+    post_result({'_stream_end': rid, 'text': res})
+    return res
+
+# LRU of full responses keyed on (normalized prompt, model): repeat prompts
+# skip the API round-trip entirely. Time-sensitive prompts are never cached.
+_response_cache = OrderedDict()
+_RESPONSE_CACHE_MAX = 256
+
 # OpenAI call wrapper
 def call_openai(prompt, api_key=None):
     if openai is None:
         return "OpenAI package not installed. Install `openai` to enable full responses."
     if api_key is None:
         return "OpenAI API key not set in environment variable OPENAI_API_KEY."
+    key = (prompt.strip().lower(), OPENAI_MODEL)
+    cacheable = 'time' not in key[0]
+    if cacheable:
+        cached = _response_cache.get(key)
+        if cached is not None:
+            _response_cache.move_to_end(key)
+            return cached
     try:
-        openai.api_key = api_key
-        resp = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[{"role":"user","content":prompt}],
-            temperature=0.6,
-            max_tokens=400,
-        )
-        return resp.choices[0].message.content.strip()
+        if _AI_LOOP is not None:
+            # hand the request to the shared asyncio loop
+            future = asyncio.run_coroutine_threadsafe(_async_chat(prompt, api_key), _AI_LOOP)
+            try:
+                res = future.result(timeout=30)
+            except Exception:
+                # stop the coroutine so it can't keep posting deltas after
+                # the error reply below has been returned
+                future.cancel()
+                raise
+        else:
+            # legacy SDK: stream synchronously on this worker
+            openai.api_key = api_key
+            resp = openai.ChatCompletion.create(
+                model=OPENAI_MODEL,
+                messages=[{"role":"user","content":prompt}],
+                temperature=0.6,
+                max_tokens=400,
+                stream=True,
+            )
+            # stream deltas straight to the UI so text appears as it arrives
+            rid = next(_stream_ids)
+            post_result({'_stream_start': rid})
+            pieces = []
+            for chunk in resp:
+                delta = chunk.choices[0].delta.get('content', '')
+                if delta:
+                    pieces.append(delta)
+                    post_result({'_stream': delta, 'id': rid})
+            res = ''.join(pieces).strip()
+            post_result({'_stream_end': rid, 'text': res})
     except Exception as e:
         return f"OpenAI request failed: {e}"
+    if cacheable:
+        _response_cache[key] = res
+        if len(_response_cache) > _RESPONSE_CACHE_MAX:
+            _response_cache.popitem(last=False)
+    # already delivered incrementally
+    return None
 
 
 def google_cse_image_search(query, api_key, cx):
@@ -91,8 +270,7 @@ def google_cse_image_search(query, api_key, cx):
             'num': 1,
         })
         url = f'https://www.googleapis.com/customsearch/v1?{qs}'
-        with urllib.request.urlopen(url, timeout=10) as resp:
-            data = json.load(resp)
+        data = json.loads(_http_get(url))
         items = data.get('items')
         if items and len(items) > 0:
             return items[0].get('link')
@@ -100,13 +278,11 @@ def google_cse_image_search(query, api_key, cx):
         return None
     return None
 
-# background thread function to process queries
-def worker_thread(prompt, use_openai):
-    api_key = os.getenv('OPENAI_API_KEY') if use_openai else None
-    # check for image query directive from local_responder
-    local = local_responder(prompt)
-    if isinstance(local, dict) and '_image_query' in local:
-        q = local['_image_query']
+# background thread function to process queries; `kind` comes from
+# parse_command so no prompt re-parsing happens here
+def worker_thread(kind, payload, use_openai):
+    if kind == 'image':
+        q = payload
         # attempt Google CSE if credentials present
         gkey = os.getenv('GOOGLE_API_KEY')
         gcx = os.getenv('GOOGLE_CX')
@@ -115,58 +291,268 @@ def worker_thread(prompt, use_openai):
             if link:
                 # download image bytes
                 try:
-                    with urllib.request.urlopen(link, timeout=10) as resp:
-                        data = resp.read()
+                    data = _http_get(link)
                     # save to temp file
                     fname = ASSET_DIR / f"img_search_{int(time.time())}.png"
                     with open(fname, 'wb') as f:
                         f.write(data)
-                    result_q.put({'text': f'Found image for "{q}"', 'image': str(fname)})
+                    post_result({'text': f'Found image for "{q}"', 'image': str(fname)})
                     return
                 except Exception as e:
                     # fallback to opening browser
                     webbrowser.open(f'https://www.google.com/search?tbm=isch&q={urllib.parse.quote(q)}')
-                    result_q.put(f'Opened browser for images: {q}')
+                    post_result(f'Opened browser for images: {q}')
                     return
-        else:
-            # no API keys: just open browser to Google Images
-            webbrowser.open(f'https://www.google.com/search?tbm=isch&q={urllib.parse.quote(q)}')
-            result_q.put(f'Opened browser for images: {q}')
-            return
+        # no API keys or no search hit: just open browser to Google Images
+        webbrowser.open(f'https://www.google.com/search?tbm=isch&q={urllib.parse.quote(q)}')
+        post_result(f'Opened browser for images: {q}')
+        return
 
     # regular text response path
+    prompt = payload
+    api_key = os.getenv('OPENAI_API_KEY') if use_openai else None
     if use_openai and api_key and openai is not None:
         res = call_openai(prompt, api_key=api_key)
+        if res is None:
+            # response was streamed to the UI chunk by chunk
+            return
     else:
-        res = local if isinstance(local, str) else local_responder(prompt)
-    result_q.put(res)
+        res = local_responder(prompt)
+    post_result(res)
 
 
+def _tts_worker(engine):
+    while True:
+        text = _tts_q.get()
+        if text is None:
+            break
+        try:
+            engine.say(text)
+            engine.runAndWait()
+        except Exception:
+            pass
+
 def init_tts():
     if pyttsx3 is None:
         return None
     try:
         engine = pyttsx3.init()
         engine.setProperty('rate', 170)
-        return engine
     except Exception:
         return None
+    threading.Thread(target=_tts_worker, args=(engine,), daemon=True).start()
+    return engine
 
 def speak_text(engine, text):
     if engine is None:
         return
-    try:
-        engine.say(text)
-        engine.runAndWait()
-    except Exception:
-        pass
+    _tts_q.put(text)
+
+
+# per-font glyph atlas for code blocks: code lines blit pre-rendered
+# characters at fixed monospace advances, skipping SDL_ttf shaping entirely
+_mono_atlas = {}
+
+def _code_atlas(mono):
+    entry = _mono_atlas.get(id(mono))
+    if entry is None:
+        glyphs = {ch: mono.render(ch, True, CODE_TEXT)
+                  for ch in string.printable if ch not in '\t\n\r\x0b\x0c'}
+        entry = (glyphs, mono.size('M')[0], mono.get_height())
+        _mono_atlas[id(mono)] = entry
+    return entry
+
+def draw_code_line(surface, mono, line, pos):
+    glyphs, glyph_w, _ = _code_atlas(mono)
+    x, y = pos
+    for ch in line:
+        g = glyphs.get(ch)
+        if g is None:
+            # non-printable / non-ASCII: render (cached) on demand
+            g = render_cached(mono, ch, CODE_TEXT)
+        surface.blit(g, (x, y))
+        x += glyph_w
+
+# per-font width table for printable ASCII: measuring a word becomes a
+# pure-Python sum instead of an SDL_ttf call
+_ascii_w = {}
+
+def _ascii_widths(font):
+    table = _ascii_w.get(id(font))
+    if table is None:
+        table = [font.size(chr(i))[0] for i in range(32, 127)]
+        _ascii_w[id(font)] = table
+    return table
+
+# per-word width cache for the wrapper; keyed on (font id, word)
+_word_w_cache = {}
+
+def _word_width(font, word):
+    key = (id(font), word)
+    w = _word_w_cache.get(key)
+    if w is None:
+        if word.isascii() and word.isprintable():
+            table = _ascii_widths(font)
+            w = sum(table[ord(c) - 32] for c in word)
+        else:
+            # non-ASCII falls back to the SDL measurement
+            w = font.size(word)[0]
+        _word_w_cache[key] = w
+    return w
+
+def wrap_words(font, words, max_w):
+    # Wrap words into lines no wider than max_w. Uses prefix sums of word
+    # widths plus a binary search for the longest run that fits, so each
+    # line costs O(log words) size queries instead of one render per word.
+    widths = [_word_width(font, w) for w in words]
+    sp = _word_width(font, ' ')
+    prefix = [0]
+    for w in widths:
+        prefix.append(prefix[-1] + w + sp)
+    lines = []
+    i, n = 0, len(words)
+    while i < n:
+        lo, hi = i + 1, n
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if prefix[mid] - prefix[i] - sp <= max_w:
+                lo = mid
+            else:
+                hi = mid - 1
+        text = ' '.join(words[i:lo]).strip()
+        if text:
+            lines.append(text)
+        i = lo
+    return lines
+
+
+# memoized per-message layouts; string messages key on the (speaker, text)
+# tuple, image entries already hold a decoded surface and lay out cheaply
+_layout_cache = OrderedDict()
+_LAYOUT_CACHE_MAX = 128
+
+def layout_message(speaker, text, font, big, mono, panel_w):
+    # Pass 1: compute this message's blits as (kind, payload, x, rel_y) with
+    # rel_y relative to the message's bottom edge, plus clickable items and
+    # the total height. No drawing happens here.
+    blits = []
+    items = []  # (type, ref, surf, x, rel_y)
+    y = 0
+
+    # speaker label
+    lab = render_cached(big, f"{speaker}:", LABEL_TEXT)
+    y -= lab.get_height() + 6
+    blits.append(('surf', lab, 16, y))
+    y -= 6
+
+    if isinstance(text, dict) and 'image' in text:
+        img = text.get('surface')
+        if img is not None:
+            y -= img.get_height()
+            blits.append(('surf', img, 16, y))
+            items.append(('image', text['image'], img, 16, y))
+            y -= 12
+        else:
+            # decode failed: fall back to showing text
+            txts = render_cached(font, str(text.get('text','[image]')), TEXT)
+            y -= txts.get_height() + 6
+            blits.append(('surf', txts, 16, y))
+    else:
+        # support code blocks fenced by ``` and links (http...)
+        s = text if isinstance(text, str) else str(text)
+        for part in _CODE_FENCE_RE.split(s):
+            if part.startswith('```') and part.endswith('```'):
+                code = part.strip('`')
+                line_h = _code_atlas(mono)[2]
+                for line in code.splitlines()[::-1]:
+                    y -= line_h + 4
+                    blits.append(('code', line, 24, y))
+            else:
+                # wrap to panel width; the last line may carry links
+                lines = wrap_words(font, part.split(' '), panel_w - 40)
+                for line in lines[:-1]:
+                    txts = render_cached(font, line, TEXT)
+                    y -= txts.get_height() + 6
+                    blits.append(('surf', txts, 16, y))
+                line = lines[-1] if lines else ''
+                if line:
+                    # single pass over the line: split into plain/link
+                    # segments and render each exactly once
+                    segments = []
+                    if 'http' in line:
+                        pos = 0
+                        for m in _URL_RE.finditer(line):
+                            if m.start() > pos:
+                                segments.append((line[pos:m.start()], TEXT, None))
+                            segments.append((m.group(1), LINK_TEXT, m.group(1)))
+                            pos = m.end()
+                        if pos < len(line):
+                            segments.append((line[pos:], TEXT, None))
+                    else:
+                        segments.append((line, TEXT, None))
+                    x = 16
+                    first = True
+                    for seg, color, url in segments:
+                        surf = render_cached(font, seg, color)
+                        if first:
+                            y -= surf.get_height() + 6
+                            first = False
+                        blits.append(('surf', surf, x, y))
+                        if url is not None:
+                            items.append(('link', url, surf, x, y))
+                        x += surf.get_width()
+    return blits, items, -y
+
+
+def redraw_chat(surface, chat, font, big, mono, origin):
+    # Pass 2: gather memoized layouts newest-first until the panel is full,
+    # then blit top-down. Returns clickable items with rects already offset
+    # by `origin` into screen coordinates.
+    surface.fill((0, 0, 0, 0))
+    ox, oy = origin
+    panel_w = surface.get_width()
+    avail = surface.get_height() - 22  # bottom margin 12, top margin 10
+    layouts = []
+    total = 0
+    for speaker, text in reversed(chat[-40:]):
+        key = (speaker, text) if isinstance(text, str) else None
+        layout = _layout_cache.get(key) if key is not None else None
+        if layout is None:
+            layout = layout_message(speaker, text, font, big, mono, panel_w)
+            if key is not None:
+                _layout_cache[key] = layout
+                if len(_layout_cache) > _LAYOUT_CACHE_MAX:
+                    _layout_cache.popitem(last=False)
+        else:
+            _layout_cache.move_to_end(key)
+        if layouts and total + layout[2] > avail:
+            break
+        layouts.append(layout)
+        total += layout[2]
+
+    rendered_items = []
+    bottom = surface.get_height() - 12
+    msg_bottom = bottom - total
+    # oldest surviving message first
+    for blits, items, height in reversed(layouts):
+        msg_bottom += height
+        for kind, payload, x, rel_y in blits:
+            if kind == 'code':
+                draw_code_line(surface, mono, payload, (x, msg_bottom + rel_y))
+            else:
+                surface.blit(payload, (x, msg_bottom + rel_y))
+        for typ, ref, surf, x, rel_y in items:
+            itm = {'rect': surf.get_rect(topleft=(x + ox, msg_bottom + rel_y + oy)),
+                   'type': typ}
+            itm['url' if typ == 'link' else 'image'] = ref
+            rendered_items.append(itm)
+    return rendered_items
 
 
 def main():
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption('Pygame Chatbot')
-    clock = pygame.time.Clock()
     tts_engine = init_tts()
 
     font = pygame.font.SysFont(None, 22)
@@ -179,11 +565,19 @@ def main():
         bg_path = ASSET_DIR / 'chatjam.png'
         if bg_path.exists():
             _img = pygame.image.load(str(bg_path)).convert()
-            chat_bg = pygame.transform.smoothscale(_img, (WIDTH, HEIGHT))
+            # convert to the display pixel format so blits take the fast path
+            chat_bg = pygame.transform.smoothscale(_img, (WIDTH, HEIGHT)).convert(screen)
     except Exception:
         chat_bg = None
-
-    input_text = ''
+    if chat_bg is None:
+        # no image: pre-fill a converted flat-color surface once and blit it
+        # each frame instead of calling screen.fill
+        chat_bg = pygame.Surface((WIDTH, HEIGHT))
+        chat_bg.fill(BG)
+        chat_bg = chat_bg.convert()
+
+    input_chars = []  # per-character input buffer; joined lazily for rendering
+    input_cache = ''  # cached join, reset to None on mutation
     chat = []  # list of (speaker, text)
     # initial greeting from ChatJam
     chat.append(('Bot', "hello i'm chatjam how can i help you today"))
@@ -198,10 +592,28 @@ def main():
     # items rendered this frame that can be clicked: dicts with keys: rect, type, url/image
     rendered_items = []
 
+    # chat index of each reply still streaming, keyed by stream id
+    stream_entries = {}
+
+    # chat panel surface, re-rendered only when chat changes
+    panel_rect = pygame.Rect(12,12, WIDTH-24, HEIGHT-120)
+    chat_surface = pygame.Surface(panel_rect.size, pygame.SRCALPHA)
+    chat_dirty = True
+
+    # static chrome (panel + input box backgrounds) composited once; the
+    # anti-aliased rounded rects are costly to redraw per frame
+    inp_rect = pygame.Rect(12, HEIGHT-96, WIDTH-24, 72)
+    chrome = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    pygame.draw.rect(chrome, PANEL, panel_rect, border_radius=8)
+    pygame.draw.rect(chrome, INPUT_BG, inp_rect, border_radius=8)
+
     running = True
+    dirty = True  # anything outside the chat panel needs a redraw
     while running:
-        dt = clock.tick(FPS) / 1000.0
-        for ev in pygame.event.get():
+        # block until input, a worker wake-up, or the frame timeout
+        ev = pygame.event.wait(timeout=1000 // FPS)
+        events = ([ev] if ev.type != pygame.NOEVENT else []) + pygame.event.get()
+        for ev in events:
             if ev.type == pygame.QUIT:
                 running = False
             elif ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
@@ -209,6 +621,7 @@ def main():
                 # close image modal if open
                 if image_modal:
                     image_modal = None
+                    dirty = True
                     continue
                 # check sign up click
                 if sign_rect and sign_rect.collidepoint((mx, my)):
@@ -227,160 +640,122 @@ def main():
                     except Exception:
                         pass
             elif ev.type == pygame.KEYDOWN and input_active:
+                dirty = True
                 if ev.key == pygame.K_BACKSPACE:
-                    input_text = input_text[:-1]
+                    if input_chars:
+                        input_chars.pop()
+                    input_cache = None
                 elif ev.key == pygame.K_RETURN:
+                    input_text = ''.join(input_chars)
                     if input_text.strip():
                         chat.append(('You', input_text))
-                        # start worker thread
-                        t = threading.Thread(target=worker_thread, args=(input_text, use_openai), daemon=True)
-                        t.start()
-                        input_text = ''
-                else:
-                    # basic printable
-                    if ev.unicode:
-                        input_text += ev.unicode
-                # toggle OpenAI with Shift key
-                if ev.key in (pygame.K_LSHIFT, pygame.K_RSHIFT):
+                        chat_dirty = True
+                        # classify once here, then hand off to the worker pool
+                        kind, payload = parse_command(input_text)
+                        _CHAT_POOL.submit(worker_thread, kind, payload, use_openai)
+                        input_chars.clear()
+                        input_cache = None
+                # toggle OpenAI with Ctrl+Shift; the Ctrl gate (and repeat
+                # check) stops plain typing chords from flipping the mode
+                elif ev.key in (pygame.K_LSHIFT, pygame.K_RSHIFT):
+                    if not (ev.mod & pygame.KMOD_CTRL) or getattr(ev, 'repeat', False):
+                        continue
                     use_openai = not use_openai
                     # notify user in chat
                     if use_openai and (openai is None or os.getenv('OPENAI_API_KEY') is None):
                         chat.append(('Bot', 'OpenAI enabled but not configured: install openai package and set OPENAI_API_KEY to use it.'))
                     else:
                         chat.append(('Bot', f'OpenAI usage set to {use_openai}'))
-
-        # collect results
-        try:
-            while True:
-                res = result_q.get_nowait()
-                # if image result dict
-                if isinstance(res, dict) and 'image' in res:
-                    chat.append(('Bot', res))
-                    # also speak short text
-                    if 'text' in res and tts_engine:
-                        threading.Thread(target=speak_text, args=(tts_engine, res['text']), daemon=True).start()
+                    chat_dirty = True
                 else:
-                    chat.append(('Bot', res))
-                    if tts_engine and isinstance(res, str):
-                        threading.Thread(target=speak_text, args=(tts_engine, res), daemon=True).start()
-        except queue.Empty:
-            pass
-
-        # draw (background image if available)
-        if chat_bg:
-            screen.blit(chat_bg, (0, 0))
-        else:
-            screen.fill(BG)
-        # chat panel
-        panel_rect = pygame.Rect(12,12, WIDTH-24, HEIGHT-120)
-        pygame.draw.rect(screen, PANEL, panel_rect, border_radius=8)
-
-        # render chat from bottom up
-        y = panel_rect.bottom - 12
-        rendered_items.clear()
-        for speaker, text in reversed(chat[-40:]):
-            # speaker label
-            lab = big.render(f"{speaker}:", True, (200,200,200))
-            y -= lab.get_height() + 6
-            screen.blit(lab, (panel_rect.left + 16, y))
-            y -= 6
-
-            if isinstance(text, dict) and 'image' in text:
-                # draw image and make it clickable
-                try:
-                    img = pygame.image.load(text['image']).convert_alpha()
-                    max_w = panel_rect.width - 40
-                    if img.get_width() > max_w:
-                        scale = max_w / img.get_width()
-                        img = pygame.transform.smoothscale(img, (int(img.get_width()*scale), int(img.get_height()*scale)))
-                    y -= img.get_height()
-                    rect = img.get_rect(topleft=(panel_rect.left + 16, y))
-                    screen.blit(img, rect.topleft)
-                    rendered_items.append({'rect': rect, 'type': 'image', 'image': text['image']})
-                    y -= 12
-                except Exception:
-                    # fallback to showing text
-                    txts = font.render(str(text.get('text','[image]')), True, TEXT)
-                    y -= txts.get_height() + 6
-                    screen.blit(txts, (panel_rect.left + 16, y))
-            else:
-                # support code blocks fenced by ``` and links (http...)
-                s = text if isinstance(text, str) else str(text)
-                # split into code blocks
-                parts = re.split(r'(```[\s\S]*?```)', s)
-                for part in parts:
-                    if part.startswith('```') and part.endswith('```'):
-                        code = part.strip('`')
-                        # render in monospace
-                        for line in code.splitlines()[::-1]:
-                            txts = mono.render(line, True, (200,220,200))
-                            y -= txts.get_height() + 4
-                            screen.blit(txts, (panel_rect.left + 24, y))
+                    # basic printable
+                    if ev.unicode:
+                        input_chars.append(ev.unicode)
+                        input_cache = None
+            elif ev.type == RESULT_EVENT:
+                # drain every result queued behind this wake-up
+                while True:
+                    try:
+                        res = result_q.get_nowait()
+                    except queue.Empty:
+                        break
+                    chat_dirty = True
+                    dirty = True
+                    # streamed response lifecycle; deltas are routed by
+                    # stream id so concurrent replies and interleaved user
+                    # messages never corrupt each other
+                    if isinstance(res, dict) and '_stream_start' in res:
+                        chat.append(('Bot', ''))
+                        stream_entries[res['_stream_start']] = len(chat) - 1
+                    elif isinstance(res, dict) and '_stream' in res:
+                        idx = stream_entries.get(res.get('id'))
+                        if idx is not None:
+                            chat[idx] = ('Bot', chat[idx][1] + res['_stream'])
+                    elif isinstance(res, dict) and '_stream_end' in res:
+                        idx = stream_entries.pop(res['_stream_end'], None)
+                        if idx is not None and res.get('text') is not None:
+                            # reconcile with the final text
+                            chat[idx] = ('Bot', res['text'])
+                        if tts_engine and res.get('text'):
+                            speak_text(tts_engine, res['text'])
+                    # if image result dict
+                    elif isinstance(res, dict) and 'image' in res:
+                        # decode + scale once here so the renderer only blits
+                        try:
+                            img = pygame.image.load(res['image']).convert_alpha()
+                            max_w = panel_rect.width - 40
+                            if img.get_width() > max_w:
+                                scale = max_w / img.get_width()
+                                img = pygame.transform.smoothscale(img, (int(img.get_width()*scale), int(img.get_height()*scale)))
+                            res['surface'] = img
+                        except Exception:
+                            res['surface'] = None
+                        chat.append(('Bot', res))
+                        # also speak short text
+                        if 'text' in res and tts_engine:
+                            speak_text(tts_engine, res['text'])
                     else:
-                        # detect links
-                        words = part.split(' ')
-                        line = ''
-                        for w in words:
-                            test = (line + ' ' + w).strip()
-                            surf = font.render(test, True, TEXT)
-                            if surf.get_width() > panel_rect.width - 40 and line:
-                                # draw current line
-                                txts = font.render(line, True, TEXT)
-                                y -= txts.get_height() + 6
-                                screen.blit(txts, (panel_rect.left + 16, y))
-                                line = w
-                            else:
-                                line = test
-                        if line:
-                            # render links inside the line
-                            # find urls
-                            url_regex = r'(https?://[^\s]+)'
-                            last_x = panel_rect.left + 16
-                            # render in segments
-                            for m in re.finditer(url_regex, line):
-                                pre = line[:m.start()]
-                                url = m.group(1)
-                                pre_surf = font.render(pre, True, TEXT)
-                                y -= pre_surf.get_height() + 6
-                                screen.blit(pre_surf, (panel_rect.left + 16, y))
-                                url_surf = font.render(url, True, (100,180,240))
-                                rect = url_surf.get_rect(topleft=(panel_rect.left + 16 + pre_surf.get_width(), y))
-                                screen.blit(url_surf, rect.topleft)
-                                rendered_items.append({'rect': rect, 'type': 'link', 'url': url})
-                                # rest after url
-                                rest = line[m.end():]
-                                if rest.strip():
-                                    rest_surf = font.render(rest, True, TEXT)
-                                    screen.blit(rest_surf, (rect.right, y))
-                            else:
-                                # no url match, just render line
-                                txts = font.render(line, True, TEXT)
-                                y -= txts.get_height() + 6
-                                screen.blit(txts, (panel_rect.left + 16, y))
-            if y < panel_rect.top + 10:
-                break
-
-        # input box
-        inp_rect = pygame.Rect(12, HEIGHT-96, WIDTH-24, 72)
-        pygame.draw.rect(screen, INPUT_BG, inp_rect, border_radius=8)
-        # render input text
-        txt = font.render(input_text, True, TEXT)
+                        chat.append(('Bot', res))
+                        if tts_engine and isinstance(res, str):
+                            speak_text(tts_engine, res)
+
+        # skip rendering entirely on clean frames
+        if not dirty:
+            continue
+
+        # draw background (image or pre-filled flat color), then the chrome
+        screen.blit(chat_bg, (0, 0))
+        screen.blit(chrome, (0, 0))
+
+        # re-render the chat panel only when it changed
+        if chat_dirty:
+            rendered_items = redraw_chat(chat_surface, chat, font, big, mono, panel_rect.topleft)
+            chat_dirty = False
+        screen.blit(chat_surface, panel_rect.topleft)
+
+        # render input text (join only when the buffer changed)
+        if input_cache is None:
+            input_cache = ''.join(input_chars)
+        txt = font.render(input_cache, True, TEXT)
         screen.blit(txt, (inp_rect.left + 12, inp_rect.top + 12))
 
         # hint
-        hint = font.render('Press Enter to send. OpenAI enabled: ' + str(use_openai), True, (180,180,180))
+        hint = render_cached(font, 'Press Enter to send. OpenAI enabled: ' + str(use_openai), HINT_TEXT)
         screen.blit(hint, (inp_rect.left + 12, inp_rect.bottom - 24))
 
         # AI toggle badge (top-right)
         badge_text = 'AI: ON' if use_openai else 'AI: OFF'
         badge_col = (30,180,30) if use_openai else (180,30,30)
-        badge_surf = font.render(badge_text, True, (255,255,255))
+        badge_surf = render_cached(font, badge_text, BADGE_TEXT)
         ai_toggle_rect = badge_surf.get_rect(topright=(WIDTH-12, 12))
         pygame.draw.rect(screen, badge_col, ai_toggle_rect.inflate(8,6), border_radius=6)
         screen.blit(badge_surf, ai_toggle_rect)
 
         pygame.display.flip()
+        dirty = False
 
+    # stop the TTS worker before tearing down
+    _tts_q.put(None)
     pygame.quit()
 
 if __name__ == '__main__':